@@ -1,6 +1,7 @@
 import argparse
-import json
 import logging
+import os
+import orjson
 from src.scraper_manager import ScraperManager
 from src.repositories import ZonapropRepository
 from src.services import ScraperService
@@ -11,38 +12,127 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
+def _load_checkpoint(path):
+    """
+    Return the last completed page recorded in the checkpoint file, or 0.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())['last_page']
+    except FileNotFoundError:
+        return 0
+
+
+def _save_checkpoint(path, last_page):
+    """
+    Atomically record the last completed page in the checkpoint file.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps({'last_page': last_page}))
+    os.replace(tmp_path, path)
+
+
+def _load_scraped_ids(path):
+    """
+    Read the listing ids already written to a JSON Lines output file.
+
+    A trailing partial line left by an interrupted write is truncated so
+    that new listings can be appended safely.
+    """
+    try:
+        with open(path, 'rb+') as f:
+            data = f.read()
+            complete_size = data.rfind(b'\n') + 1
+            if complete_size < len(data):
+                f.truncate(complete_size)
+    except FileNotFoundError:
+        return set()
+    return {orjson.loads(line).get('id') for line in data[:complete_size].splitlines() if line.strip()}
+
+
 def main():
     """
     Command-line entry point for the Zonaprop scraping tool.
 
     This function parses CLI arguments, wires up the scraping components
     (`ScraperService`, `ZonapropRepository`, `ScraperManager`), runs the
-    scraping process and persists the results to a JSON file.
+    scraping process and persists the results to a JSON Lines file (one
+    listing per line, written as soon as each page is scraped) or to a
+    single pretty-printed JSON document.
+
+    In JSON Lines mode the last completed page is recorded in
+    `<output>.checkpoint.json` after every page, so an interrupted run can
+    be continued with `--resume` without scraping finished pages again.
 
     CLI arguments:
         --max_pages: Maximum number of result pages to traverse.
-        --output: Name of the output JSON file.
+        --output: Name of the output file.
         --url: Initial listings URL to start scraping from.
+        --max_workers: Maximum number of concurrent requests.
+        --format: Output format, either `jsonl` or `json`.
+        --no_cache: Disable the on-disk HTTP response cache.
+        --requests_per_second: Maximum request rate towards Zonaprop.
+        --resume: Continue an interrupted JSON Lines run from its checkpoint.
     """
 
     parser = argparse.ArgumentParser(description='Scrape Zonaprop listings.')
     parser.add_argument('--max_pages', type=int, default=2, help='Maximum number of pages to scrape')
-    parser.add_argument('--output', type=str, default='zonaprop_caballito_rentals.json', help='Output JSON file name')
+    parser.add_argument('--output', type=str, default='zonaprop_caballito_rentals.jsonl', help='Output file name')
     parser.add_argument('--url', type=str, default='https://www.zonaprop.com.ar/casas-departamentos-ph-alquiler-caballito.html', help='Starting URL for scraping')
+    parser.add_argument('--max_workers', type=int, default=8, help='Maximum number of concurrent requests')
+    parser.add_argument('--format', type=str, choices=['jsonl', 'json'], default='jsonl', help='Output format')
+    parser.add_argument('--no_cache', action='store_true', help='Disable the on-disk HTTP response cache')
+    parser.add_argument('--requests_per_second', type=float, default=1.0, help='Maximum number of requests per second')
+    parser.add_argument('--resume', action='store_true', help='Resume an interrupted run from its checkpoint (jsonl only)')
     args = parser.parse_args()
+    if args.max_workers < 1:
+        parser.error('--max_workers must be at least 1')
+    if args.requests_per_second <= 0:
+        parser.error('--requests_per_second must be greater than 0')
+    if args.resume and args.format != 'jsonl':
+        parser.error('--resume is only supported with --format jsonl')
+
+    logger.info(f"Starting scraping process with max_pages={args.max_pages}, output={args.output}, url={args.url}, max_workers={args.max_workers}, format={args.format}, no_cache={args.no_cache}, requests_per_second={args.requests_per_second}, resume={args.resume}")
 
-    logger.info(f"Starting scraping process with max_pages={args.max_pages}, output={args.output}, url={args.url}")
+    scraper_service = ScraperService(
+        max_concurrency=args.max_workers,
+        cache_name=None if args.no_cache else 'zonaprop_cache',
+        requests_per_second=args.requests_per_second,
+    )
+    repository = ZonapropRepository(scraper_service, max_workers=args.max_workers)
+    manager = ScraperManager(repository, max_workers=args.max_workers)
 
-    scraper_service = ScraperService()
-    repository = ZonapropRepository(scraper_service)
-    manager = ScraperManager(repository)
+    if args.format == 'jsonl':
+        checkpoint_path = f"{args.output}.checkpoint.json"
+        start_page = 1
+        if args.resume:
+            start_page = _load_checkpoint(checkpoint_path) + 1
+            repository.mark_seen(_load_scraped_ids(args.output))
+            logger.info(f"Resuming from page {start_page}")
 
-    listings = manager.scrape(args.url, max_pages=args.max_pages)
+        # Stream each page to disk as soon as it is done, then checkpoint it
+        count = 0
+        with open(args.output, 'ab' if args.resume else 'wb') as f:
+            for page_num, page_listings in manager.iter_pages(args.url, max_pages=args.max_pages, start_page=start_page):
+                for listing in page_listings:
+                    f.write(orjson.dumps(listing.to_dict()) + b'\n')
+                count += len(page_listings)
+                f.flush()
+                _save_checkpoint(checkpoint_path, page_num)
+
+        # The run completed, so there is nothing left to resume
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+    else:
+        listings = manager.scrape(args.url, max_pages=args.max_pages)
+        count = len(listings)
+        if listings:
+            with open(args.output, 'wb') as f:
+                f.write(orjson.dumps([listing.to_dict() for listing in listings], option=orjson.OPT_INDENT_2))
 
-    if listings:
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump([listing.to_dict() for listing in listings], f, ensure_ascii=False, indent=4)
-        logger.info(f"Scraped {len(listings)} listings and saved to {args.output}")
+    if count:
+        logger.info(f"Scraped {count} listings and saved to {args.output}")
     else:
         logger.warning("No listings were found or scraped.")
 
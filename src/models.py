@@ -1,9 +1,12 @@
-from dataclasses import dataclass, field
+import logging
+from dataclasses import dataclass, field, fields
 from typing import List, Optional
 from datetime import date
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+@dataclass(slots=True)
 class Listing:
     """
     Domain model representing a single real-estate listing on Zonaprop.
@@ -38,17 +41,17 @@ class Listing:
         Update this listing in-place with information.
 
         Only attributes that already exist on `Listing` are set; unknown
-        keys in `details` are ignored (a warning is printed).
+        keys in `details` are ignored (a warning is logged).
 
         Args:
             details: Dictionary where keys correspond to attribute names
                 on the `Listing` class and values contain the new data.
         """
         for key, value in details.items():
-            if hasattr(self, key):
+            if key in _LISTING_FIELD_NAMES:
                 setattr(self, key, value)
             else:
-                print(f"Warning: Attribute '{key}' not found in Listing class")
+                logger.warning("Attribute '%s' not found in Listing class", key)
 
     def to_dict(self):
         """
@@ -60,10 +63,14 @@ class Listing:
         Returns:
             A dictionary representation of the listing suitable for JSON.
         """
-        result = {
-            key: value for key, value in self.__dict__.items()
-            if not key.startswith('_') and value is not None
-        }
+        result = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if not f.name.startswith('_') and value is not None:
+                result[f.name] = value
         if 'date' in result:
             result['date'] = result['date'].isoformat()
         return result
+
+
+_LISTING_FIELD_NAMES = frozenset(f.name for f in fields(Listing))
@@ -4,8 +4,12 @@ from typing import List, Optional
 
 import logging
 import re
-import json
-from bs4 import BeautifulSoup
+import orjson
+import lxml.html
+import threading
+from lxml import etree
+from lxml.cssselect import CSSSelector
+from concurrent.futures import ThreadPoolExecutor
 from src.models import Listing
 from datetime import date
 from src.utils import (
@@ -18,6 +22,62 @@ from src.utils import (
 
 logger = logging.getLogger(__name__)
 
+_PAGING_RE = re.compile(r'PAGING_(\d+)')
+_PAGE_URL_RE = re.compile(r'-pagina-(\d+)\.html')
+_ID_RE = re.compile(r'-(\d+)\.html$')
+_NUM_RE = re.compile(r'\d+')
+_PUBLISHER_KEY = b"'publisher'"
+_PUBLISHER_RE = re.compile(rb"'publisher'\s*:\s*(\{[^}]+\})")
+_FEATURE_SECTION_RE = re.compile(rb'<ul[^>]*\bid=["\']section-icon-features-property["\'][^>]*>.*?</ul>', re.DOTALL)
+
+# Selectors used for every listing card, compiled once
+_CARD_LINK_SELECTOR = CSSSelector('a')
+_CARD_PRICE_SELECTOR = CSSSelector('div[data-qa="POSTING_CARD_PRICE"]')
+_CARD_EXPENSES_SELECTOR = CSSSelector('div[data-qa="expensas"]')
+_CARD_ADDRESS_SELECTOR = CSSSelector('div.postingAddress')
+_CARD_LOCATION_SELECTOR = CSSSelector('h2[data-qa="POSTING_CARD_LOCATION"]')
+_CARD_DESCRIPTION_SELECTOR = CSSSelector('h3[data-qa="POSTING_CARD_DESCRIPTION"]')
+
+_ACTIVE_PAGER_SELECTOR = CSSSelector('a.active[data-qa^="PAGING_"]')
+_PAGER_SELECTOR = CSSSelector('a[data-qa^="PAGING_"]')
+
+# Listing cards of a results page
+_CARDS_XPATH = etree.XPath(
+    '//div[contains(concat(" ", normalize-space(@class), " "), " PostingCardLayout-sc-i1odl-0 ")]'
+)
+
+# Feature spans ("45 m² tot.", "2 amb.", ...) of a listing card
+_CARD_FEATURES_XPATH = etree.XPath(
+    './/h3[contains(concat(" ", normalize-space(@class), " "), " PostingMainFeaturesBlock-sc-1uhtbxc-0 ")]//span'
+)
+
+# Icons of the detail page feature section
+_FEATURE_ICONS_XPATH = etree.XPath('.//i[contains(@class, "icon-")]')
+
+# Maps the icon classes of the detail page feature section to `Listing` attributes
+_ICON_TO_ATTR = {
+    'icon-stotal': 'total_area',
+    'icon-scubierta': 'covered_area',
+    'icon-ambiente': 'rooms',
+    'icon-bano': 'bathrooms',
+    'icon-cochera': 'parking_spaces',
+    'icon-dormitorio': 'bedrooms',
+    'icon-antiguedad': 'age'
+}
+
+# Zonaprop serves UTF-8, so pages are parsed from bytes without charset
+# detection, and comments/processing instructions are dropped while
+# parsing. lxml locks a parser while it is in use, so every thread gets
+# its own instead of sharing one.
+_parser_local = threading.local()
+
+
+def _get_html_parser():
+    parser = getattr(_parser_local, 'parser', None)
+    if parser is None:
+        parser = _parser_local.parser = lxml.html.HTMLParser(encoding='utf-8', remove_comments=True, remove_pis=True)
+    return parser
+
 
 class ListingRepository(ABC):
     @abstractmethod
@@ -41,15 +101,24 @@ class ZonapropRepository(ListingRepository):
     required to build `Listing` objects from search result and detail pages.
     """
 
-    def __init__(self, scraper_service: ScraperService):
+    def __init__(self, scraper_service: ScraperService, max_workers: int = 8):
         self.scraper_service = scraper_service
+        self.max_workers = max_workers
+        self._seen_ids = set()
+        self._seen_ids_lock = threading.Lock()
 
     def get_all_page_urls(self, start_url: str, max_pages: Optional[int] = None) -> List[str]:
         """
         Discover all pagination URLs starting from the given Zonaprop URL.
 
-        Follows the "next page" links until either there are no more pages
-        or the optional `max_pages` limit is reached.
+        Every consecutive page linked from a results page's pager is
+        collected in one pass, so a single request usually enumerates all
+        pages. Only when the pager links to a page beyond the last
+        consecutive one (a windowed pager) does discovery continue from the
+        last page found, until either there are no more pages or the
+        optional `max_pages` limit is reached. Discovery also stops if a
+        page does not advance past the previous one or links back to a URL
+        that was already found.
 
         Args:
             start_url: URL of the first Zonaprop results page.
@@ -58,46 +127,115 @@ class ZonapropRepository(ListingRepository):
         Returns:
             List of strings with absolute URLs for each discovered page.
         """
-        logger.info(f"Getting page URLs starting from: {start_url}")
+        logger.info("Getting page URLs starting from: %s", start_url)
         page_urls = [start_url]
+        seen_urls = {start_url}
         current_url = start_url
-        page_num = 1
+        previous_page = None
 
         while current_url:
 
             # Break if we reached the max pages limit
-            if max_pages is not None and page_num >= max_pages:
-                logger.info(f"Reached max pages limit: {max_pages}")
+            if max_pages is not None and len(page_urls) >= max_pages:
+                logger.info("Reached max pages limit: %s", max_pages)
                 break
 
-            response = self.scraper_service.rate_limited_request(current_url, headers={'User-Agent': 'Mozilla/5.0'})
+            response = self.scraper_service.rate_limited_request(current_url)
             if not response:
-                logger.warning(f"Failed to get response from {current_url}")
+                logger.warning("Failed to get response from %s", current_url)
                 break
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            current_page = int(re.search(r'PAGING_(\d+)', str(soup)).group(1))
-            next_page = soup.find('a', attrs={'data-qa': f'PAGING_{current_page + 1}'})
+            try:
+                tree = lxml.html.fromstring(response.content, parser=_get_html_parser())
+            except etree.ParserError as e:
+                logger.warning("Could not parse %s: %s", current_url, e)
+                break
+            current_page = self._get_current_page(current_url, tree)
+            if current_page is None:
+                logger.warning("Could not find pagination links in %s", current_url)
+                break
 
-            if next_page:
-                next_page_url = f"https://www.zonaprop.com.ar{next_page['href']}"
+            # A page that does not advance means the pagination cannot be followed
+            if previous_page is not None and current_page <= previous_page:
+                logger.warning("Pagination did not advance past page %s at %s", previous_page, current_url)
+                break
+            previous_page = current_page
+
+            # Take every consecutive page the pager links to
+            pager_hrefs = self._get_pager_hrefs(tree)
+            next_page = current_page + 1
+            while next_page in pager_hrefs and (max_pages is None or len(page_urls) < max_pages):
+                next_page_url = f"https://www.zonaprop.com.ar{pager_hrefs[next_page]}"
+                if next_page_url in seen_urls:
+                    logger.warning("Pagination links back to %s", next_page_url)
+                    current_url = None
+                    break
                 page_urls.append(next_page_url)
-                current_url = next_page_url
-                page_num += 1
-                logger.info(f"Found page {page_num}: {next_page_url}")
+                seen_urls.add(next_page_url)
+                logger.info("Found page %s: %s", len(page_urls), next_page_url)
+                next_page += 1
             else:
-                logger.info("No more pages found")
-                break
-
-        logger.info(f"Found a total of {len(page_urls)} pages")
+                # Only a windowed pager links past the last consecutive page
+                last_page = next_page - 1
+                if last_page == current_page or max(pager_hrefs) <= last_page:
+                    logger.info("No more pages found")
+                    break
+                current_url = page_urls[-1]
+
+        logger.info("Found a total of %s pages", len(page_urls))
         return page_urls
 
+    def _get_pager_hrefs(self, tree):
+        """
+        Collect the links of all numbered pagination anchors.
+
+        Args:
+            tree: Parsed lxml root element of the results page.
+
+        Returns:
+            Dictionary mapping page numbers to their relative URLs.
+        """
+        pager_hrefs = {}
+        for link in _PAGER_SELECTOR(tree):
+            match = _PAGING_RE.fullmatch(link.get('data-qa'))
+            if match and link.get('href'):
+                pager_hrefs[int(match.group(1))] = link.get('href')
+        return pager_hrefs
+
+    def _get_current_page(self, url, tree):
+        """
+        Determine the current page number of a results page.
+
+        The number is read from the `-pagina-N` suffix of the URL when
+        present. Otherwise the active pagination anchor is used, falling
+        back to the first numbered anchor.
+
+        Args:
+            url: URL of the results page.
+            tree: Parsed lxml root element of the results page.
+
+        Returns:
+            The current page number, or `None` if no pagination is found.
+        """
+        match = _PAGE_URL_RE.search(url)
+        if match:
+            return int(match.group(1))
+
+        pager_links = _ACTIVE_PAGER_SELECTOR(tree) or _PAGER_SELECTOR(tree)
+        for link in pager_links:
+            match = _PAGING_RE.fullmatch(link.get('data-qa'))
+            if match:
+                return int(match.group(1))
+        return None
+
     def scrape_page(self, url):
         """
         Scrape all listing cards from a single Zonaprop results page.
 
         For each card, this method builds a base `Listing` object using
-        summary information and then enriches it by fetching the detail page.
+        summary information. The detail pages of all cards are then fetched
+        concurrently (up to `max_workers` at a time) to enrich them.
+        Listings already seen on another page are skipped.
 
         Args:
             url: Absolute URL of the Zonaprop results page.
@@ -105,67 +243,101 @@ class ZonapropRepository(ListingRepository):
         Returns:
             List of fully-populated `Listing` instances.
         """
-        logger.info(f"Scraping page: {url}")
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        logger.info("Scraping page: %s", url)
 
         # Make a request to the results page
-        response = self.scraper_service.rate_limited_request(url, headers)
+        response = self.scraper_service.rate_limited_request(url)
         if not response:
-            logger.error(f"Failed to get response from {url}")
+            logger.error("Failed to get response from %s", url)
             return []
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        listings = []
-        listing_containers = soup.find_all('div', class_='PostingCardLayout-sc-i1odl-0')
+        try:
+            tree = lxml.html.fromstring(response.content, parser=_get_html_parser())
+        except etree.ParserError as e:
+            logger.error("Could not parse %s: %s", url, e)
+            return []
+        items = []
+        listing_containers = _CARDS_XPATH(tree)
 
-        logger.info(f"Found {len(listing_containers)} listings on this page")
+        logger.info("Found %s listings on this page", len(listing_containers))
 
         for index, listing in enumerate(listing_containers, start=1):
-            logger.info(f"Processing listing {index} of {len(listing_containers)}")
+            logger.debug("Processing listing %s of %s", index, len(listing_containers))
             try:
                 # Extract the listing URL from the listing container
-                listing_url = f"https://www.zonaprop.com.ar{safe_extract(listing, 'a', 'href')}"
-                id_match = re.search(r'-(\d+)\.html$', listing_url)
+                listing_url = f"https://www.zonaprop.com.ar{safe_extract(listing, _CARD_LINK_SELECTOR, 'href')}"
+                id_match = _ID_RE.search(listing_url)
                 listing_id = id_match.group(1) if id_match else None
+                if listing_id is not None and not self._claim_id(listing_id):
+                    logger.debug("Skipping duplicate listing %s", listing_id)
+                    continue
+                price = safe_extract(listing, _CARD_PRICE_SELECTOR)
 
                 # Build the listing object with the base information
                 item = Listing(
                     id=listing_id,
                     date=date.today(),
-                    price=clean_price_string(safe_extract(listing, 'div[data-qa="POSTING_CARD_PRICE"]')),
-                    currency=get_currency_type(safe_extract(listing, 'div[data-qa="POSTING_CARD_PRICE"]')),
-                    expenses=clean_expenses_string(safe_extract(listing, 'div[data-qa="expensas"]')),
-                    location_address=safe_extract(listing, 'div.postingAddress'),
-                    location_area=safe_extract(listing, 'h2[data-qa="POSTING_CARD_LOCATION"]'),
-                    features=[span.text.strip() for span in listing.select('h3.PostingMainFeaturesBlock-sc-1uhtbxc-0 span')],
-                    description=safe_extract(listing, 'h3[data-qa="POSTING_CARD_DESCRIPTION"]'),
+                    price=clean_price_string(price),
+                    currency=get_currency_type(price),
+                    expenses=clean_expenses_string(safe_extract(listing, _CARD_EXPENSES_SELECTOR)),
+                    location_address=safe_extract(listing, _CARD_ADDRESS_SELECTOR),
+                    location_area=safe_extract(listing, _CARD_LOCATION_SELECTOR),
+                    features=[span.text_content().strip() for span in _CARD_FEATURES_XPATH(listing)],
+                    description=safe_extract(listing, _CARD_DESCRIPTION_SELECTOR),
                     url=listing_url
                 )
+                items.append(item)
+            except Exception as e:
+                logger.error("Error parsing listing %s: %s", index, e)
 
-                logger.info(f"Scraping detailed information for listing: {item.url}")
+        # Scrape additional information from all listing detail pages concurrently
+        listings = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.scrape_listing_details, item.url) for item in items]
+            for item, future in zip(items, futures):
+                try:
+                    # Update the listing object with the additional information
+                    item.update_details(future.result())
 
-                # Scrape additional information from the listing detail page
-                detailed_info = self.scrape_listing_details(item.url)
+                    # Add the listing object to the list of listings
+                    listings.append(item)
 
-                # Update the listing object with the additional information
-                item.update_details(detailed_info)
+                    logger.debug("Successfully processed listing with ID %s", item.id)
+                except Exception as e:
+                    logger.error("Error scraping details for listing %s: %s", item.url, e)
 
-                # Add the listing object to the list of listings
-                listings.append(item)
+        return listings
 
-                logger.info(f"Successfully processed listing {index} with ID {listing_id}")
-            except Exception as e:
-                logger.error(f"Error parsing listing {index}: {e}")
+    def mark_seen(self, listing_ids):
+        """
+        Record listing ids scraped earlier (e.g. by an interrupted run) so
+        that they are skipped.
 
-        return listings
+        Args:
+            listing_ids: Iterable of listing id strings.
+        """
+        with self._seen_ids_lock:
+            self._seen_ids.update(listing_ids)
+
+    def _claim_id(self, listing_id):
+        """
+        Atomically check and record a single listing id.
+
+        Returns:
+            `True` if the id was new, `False` if it had already been seen.
+        """
+        with self._seen_ids_lock:
+            if listing_id in self._seen_ids:
+                return False
+            self._seen_ids.add(listing_id)
+            return True
 
     def scrape_listing_details(self, url):
         """
         Scrape additional feature and publisher information for a listing.
 
-        This fetches the individual listing detail page to extract structured data.
+        This fetches the individual listing detail page to extract structured
+        data.
 
         Args:
             url: Absolute URL of the listing detail page.
@@ -173,97 +345,107 @@ class ZonapropRepository(ListingRepository):
         Returns:
             Dictionary with extra attributes to update a `Listing`.
         """
-        logger.info(f"Scraping detailed listing from: {url}")
+        logger.debug("Scraping detailed listing from: %s", url)
 
         # Make a request to the listing page
-        response = self.scraper_service.rate_limited_request(url, headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'})
+        response = self.scraper_service.rate_limited_request(url)
         if not response:
-            logger.warning(f"No response received for listing: {url}")
+            logger.warning("No response received for listing: %s", url)
             return {}
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        details = {}
-
         # Extract information from the listing page
-        details.update(self._extract_feature_information(soup))
-        details.update(self._extract_publisher_information(soup))
+        details = {}
+        details.update(self._extract_feature_information(response.content))
+        details.update(self._extract_publisher_information(response.content))
 
-        logger.info(f"Finished scraping details for listing: {url}")
+        logger.debug("Finished scraping details for listing: %s", url)
         return details
 
-    def _extract_feature_information(self, soup):
+    def _extract_feature_information(self, html):
         """
         Extract structured feature information from a listing detail page.
 
+        Only the feature section is parsed: its markup is sliced out of the
+        raw HTML first, so the rest of the document never becomes a tree.
+
         Args:
-            soup: BeautifulSoup instance of the listing detail HTML.
+            html: Raw UTF-8 encoded HTML of the listing detail page.
 
         Returns:
             Dictionary mapping feature names to values.
         """
         details = {}
-        feature_section = soup.find('ul', id='section-icon-features-property')
-        if feature_section:
-            logger.info("Found feature section in the listing page")
-            icon_to_attr = {
-                'icon-stotal': 'total_area',
-                'icon-scubierta': 'covered_area',
-                'icon-ambiente': 'rooms',
-                'icon-bano': 'bathrooms',
-                'icon-cochera': 'parking_spaces',
-                'icon-dormitorio': 'bedrooms',
-                'icon-antiguedad': 'age'
-            }
-
-            # Extract the feature information by iterating over the icon_to_attr dictionary
-            for icon_class, attr_name in icon_to_attr.items():
-                element = feature_section.find('i', class_=icon_class)
-                if element and element.parent:
-                    value = element.parent.get_text(strip=True)
-                    numeric_value = re.search(r'\d+', value)
-                    if numeric_value:
-                        details[attr_name] = numeric_value.group()
-                        logger.info(f"Extracted {attr_name}: {details[attr_name]}")
-                    else:
-                        logger.warning(f"Could not extract numeric value for {attr_name}")
+        section_match = _FEATURE_SECTION_RE.search(html)
+        if section_match:
+            feature_section = lxml.html.fragment_fromstring(section_match.group(), parser=_get_html_parser())
+            logger.debug("Found feature section in the listing page")
+            found_attrs = set()
+
+            # Extract the feature information in a single pass over the icons
+            for icon in _FEATURE_ICONS_XPATH(feature_section):
+                attr_name = next((_ICON_TO_ATTR[cls] for cls in icon.get('class').split() if cls in _ICON_TO_ATTR), None)
+                if attr_name is None or attr_name in found_attrs or icon.getparent() is None:
+                    continue
+                found_attrs.add(attr_name)
+
+                value = icon.getparent().text_content().strip()
+                numeric_value = _NUM_RE.search(value)
+                if numeric_value:
+                    details[attr_name] = numeric_value.group()
+                    logger.debug("Extracted %s: %s", attr_name, details[attr_name])
                 else:
-                    logger.warning(f"Could not find element for {attr_name}")
+                    logger.warning("Could not extract numeric value for %s", attr_name)
+
+            for attr_name in _ICON_TO_ATTR.values():
+                if attr_name not in found_attrs:
+                    logger.warning("Could not find element for %s", attr_name)
         else:
             logger.warning("Could not find feature section in the listing page")
 
         return details
 
-    def _extract_publisher_information(self, soup):
+    def _extract_publisher_information(self, html):
         """
         Extract publisher metadata embedded in inline JavaScript.
 
+        The publisher object is searched for directly in the raw bytes of
+        the page, which avoids decoding the document and walking every
+        `<script>` element of a parsed tree. Candidates are located with a
+        plain substring search and the regex only runs where one is found.
+
         Args:
-            soup: BeautifulSoup instance of the listing detail HTML.
+            html: Raw UTF-8 encoded HTML of the listing detail page.
 
         Returns:
             Dictionary with publisher-related fields.
         """
         details = {}
-        script_tags = soup.find_all('script')
-
-        # Extract the publisher data by iterating over the script tags
-        for script in script_tags:
-            if script.string and "'publisher':" in script.string:
-                match = re.search(r"'publisher'\s*:\s*(\{[^}]+\})", script.string)
-                if match:
-                    publisher_json = match.group(1).replace("'", '"')
-                    try:
-                        publisher_data = json.loads(publisher_json)
-                        details['publisher_name'] = publisher_data.get('name')
-                        details['publisher_id'] = publisher_data.get('publisherId')
-                        details['publisher_url'] = publisher_data.get('url')
-                        logger.info(f"Extracted publisher data: {publisher_data}")
-                        break
-                    except json.JSONDecodeError:
-                        logger.error("Error decoding publisher JSON")
-                else:
-                    logger.warning("Could not find publisher data in script")
+
+        # Extract the publisher data from the first blob that decodes successfully
+        for match in _iter_publisher_matches(html):
+            publisher_json = match.group(1).replace(b"'", b'"')
+            try:
+                publisher_data = orjson.loads(publisher_json)
+                details['publisher_name'] = publisher_data.get('name')
+                details['publisher_id'] = publisher_data.get('publisherId')
+                details['publisher_url'] = publisher_data.get('url')
+                logger.debug("Extracted publisher data: %s", publisher_data)
+                break
+            except orjson.JSONDecodeError:
+                logger.error("Error decoding publisher JSON")
         else:
-            logger.warning("Could not find script with publisher data")
+            logger.warning("Could not find publisher data in the listing page")
 
         return details
+
+
+def _iter_publisher_matches(html):
+    """
+    Yield `_PUBLISHER_RE` matches anchored at each `'publisher'` key in `html`.
+    """
+    start = html.find(_PUBLISHER_KEY)
+    while start != -1:
+        match = _PUBLISHER_RE.match(html, start)
+        if match:
+            yield match
+        start = html.find(_PUBLISHER_KEY, start + 1)
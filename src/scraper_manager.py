@@ -1,7 +1,8 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from src.repositories import ListingRepository
 from src.models import Listing
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -11,23 +12,55 @@ class ScraperManager:
     Orchestrates the scraping process across multiple pages.
 
     This class coordinates the retrieval of all listing page URLs from
-    the repository, then iterates through each page to scrape the listings
-    and aggregate the results.
+    the repository, then scrapes the pages concurrently (up to
+    `max_workers` at a time) and aggregates the results in page order.
     """
 
-    def __init__(self, repository: ListingRepository):
+    def __init__(self, repository: ListingRepository, max_workers: int = 4):
         self.repository = repository
+        self.max_workers = max_workers
 
-    def scrape(self, start_url: str, max_pages: Optional[int] = None) -> List[Listing]:
+    def iter_pages(self, start_url: str, max_pages: Optional[int] = None, start_page: int = 1) -> Iterator[Tuple[int, List[Listing]]]:
+        """
+        Scrape all pages and yield each page's listings as soon as it is done.
+
+        Pages are yielded in order, so callers can persist them
+        incrementally and record the last completed page to resume from.
+
+        Args:
+            start_url: URL of the first results page.
+            max_pages: Optional maximum number of pages to scrape.
+            start_page: Number of the first page to scrape; earlier pages
+                are skipped (used to resume an interrupted run).
+
+        Yields:
+            Tuples of `(page_num, listings)` for every scraped page.
+        """
 
         # Get all page URLs from the repository
         page_urls = self.repository.get_all_page_urls(start_url, max_pages)
-        all_listings = []
+        pending_urls = page_urls[start_page - 1:]
 
-        # Iterate through each page to scrape the listings and aggregate the results
-        for page_num, page_url in enumerate(page_urls, start=1):
-            logger.info(f"Scraping page {page_num} of {len(page_urls)}")
-            page_listings = self.repository.scrape_page(page_url)
-            all_listings.extend(page_listings)
+        # Scrape the pages concurrently and yield the results page by page
+        logger.info("Scraping %s pages with up to %s workers", len(pending_urls), self.max_workers)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for page_num, page_listings in enumerate(executor.map(self.repository.scrape_page, pending_urls), start=start_page):
+                logger.info("Finished page %s of %s with %s listings", page_num, len(page_urls), len(page_listings))
+                yield page_num, page_listings
 
-        return all_listings
+    def iter_scrape(self, start_url: str, max_pages: Optional[int] = None) -> Iterator[Listing]:
+        """
+        Scrape all pages and yield listings as soon as each page is done.
+
+        Args:
+            start_url: URL of the first results page.
+            max_pages: Optional maximum number of pages to scrape.
+
+        Yields:
+            `Listing` instances from every scraped page, in page order.
+        """
+        for _, page_listings in self.iter_pages(start_url, max_pages):
+            yield from page_listings
+
+    def scrape(self, start_url: str, max_pages: Optional[int] = None) -> List[Listing]:
+        return list(self.iter_scrape(start_url, max_pages))
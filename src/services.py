@@ -1,57 +1,265 @@
 import requests
 import logging
-import time
 import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
+from requests_cache import CachedSession, create_key
 
 logger = logging.getLogger(__name__)
 
+# Results pages change as listings are added; detail pages rarely do
+RESULTS_PAGE_EXPIRE_AFTER = timedelta(hours=1)
+LISTING_PAGE_EXPIRE_AFTER = timedelta(days=7)
+
+# Accept-Encoding is left to requests: it asks for gzip/deflate, and for
+# br only when the `brotli` package is installed to decode it
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Seconds to wait for the server to connect and to send data
+REQUEST_TIMEOUT = 30
+
+# Status codes the server uses to ask us to slow down
+THROTTLE_STATUS_CODES = (429, 503)
+MAX_THROTTLE_RETRIES = 5
+
+_LISTING_PATH_RE = re.compile(r'^/propiedades/.*-(\d+)\.html$')
+
+
+def _cache_key(request, **kwargs):
+    """
+    Build the cache key for a request.
+
+    Listing detail pages are keyed by their numeric listing id so that
+    changes in the URL slug or tracking parameters do not invalidate them.
+    """
+    match = _LISTING_PATH_RE.match(urlsplit(request.url).path)
+    if match:
+        return f"listing-{match.group(1)}"
+    return create_key(request, **kwargs)
+
+
+def _parse_retry_after(value):
+    """
+    Parse a `Retry-After` header value into a number of seconds.
+
+    Args:
+        value: Header value, either delta-seconds or an HTTP date.
+
+    Returns:
+        Seconds to wait, or `None` if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    if value.strip().isdecimal():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket that adapts its rate to server feedback.
+
+    Tokens refill at `rate` per second up to `burst`. When the server
+    throttles us the rate is halved and no tokens are handed out until the
+    requested pause is over; every successful response then raises the
+    rate linearly back towards `max_rate`. Waits are stretched by a random
+    `jitter` fraction of the token interval so requests do not arrive on a
+    fixed beat.
+    """
+
+    def __init__(self, max_rate: float, min_rate: float = 0.1, burst: float = 1.0, increase: float = 0.02, jitter: float = 0.5):
+        if max_rate <= 0:
+            raise ValueError(f"max_rate must be greater than 0, got {max_rate}")
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.burst = burst
+        self.increase = increase
+        self.jitter = jitter
+        self.rate = max_rate
+        self._tokens = burst
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """
+        Block until a token is available and take it.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+                wait += random.uniform(0, self.jitter / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def throttle(self, pause: float):
+        """
+        Halve the rate and pause all callers for `pause` seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            self._last_refill = now
+            self._blocked_until = max(self._blocked_until, now + pause)
+
+    def reward(self):
+        """
+        Raise the rate linearly after a successful response.
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+
 class ScraperService:
     """
     Low-level HTTP client for the scraper with retries and rate limiting.
 
     This service wraps a `requests.Session` configured with automatic
-    retries and adds a random delay before each outbound request to
-    reduce the risk of being rate-limited by the remote server.
+    retries and paces outbound requests with a `TokenBucketRateLimiter`
+    shared by all threads. The limiter backs off when the server answers
+    429/503 (honoring `Retry-After`) and speeds up again while responses
+    succeed. The number of in-flight requests per host is capped, so the
+    service can be used safely by concurrent workers.
+
+    Responses are cached on disk (SQLite) when `cache_name` is given;
+    expired entries are revalidated with `If-None-Match` /
+    `If-Modified-Since`, so unchanged pages come back as 304 without a body.
     """
-    def __init__(self):
-        self.session = self.create_session_with_retries()
+    def __init__(self, max_concurrency: int = 8, cache_name: Optional[str] = 'zonaprop_cache', requests_per_second: float = 1.0):
+        self.session = self.create_session_with_retries(cache_name, pool_maxsize=max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = TokenBucketRateLimiter(max_rate=requests_per_second)
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
 
     @staticmethod
-    def create_session_with_retries():
+    def create_session_with_retries(cache_name: Optional[str] = None, pool_maxsize: int = 10):
         """
         Create and configure a `requests.Session` with retry behavior.
 
+        Args:
+            cache_name: Optional path of the SQLite response cache. When
+                omitted, a plain non-caching session is returned.
+            pool_maxsize: Number of keep-alive connections kept per host.
+                Should be at least the number of concurrent workers so
+                that every worker reuses a warm TCP/TLS connection.
+
         Returns:
             A `requests.Session` instance that will automatically retry
             failed requests for a subset of 5xx HTTP status codes.
+            Throttling responses (429/503) are left to the rate limiter.
         """
-        session = requests.Session()
-        retries = Retry(total=5, backoff_factor=0.1, status_forcelist=[500, 502, 503, 504])
-        session.mount('https://', HTTPAdapter(max_retries=retries))
+        if cache_name:
+            session = CachedSession(
+                cache_name,
+                backend='sqlite',
+                expire_after=RESULTS_PAGE_EXPIRE_AFTER,
+                urls_expire_after={'www.zonaprop.com.ar/propiedades/': LISTING_PAGE_EXPIRE_AFTER},
+                allowable_methods=['GET'],
+                key_fn=_cache_key,
+            )
+        else:
+            session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        # 429/503 must reach rate_limited_request untouched so the token
+        # bucket can slow down and honor Retry-After; urllib3 would
+        # otherwise retry them itself whenever the header is present
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 504], allowed_methods=['GET'], respect_retry_after_header=False)
+        # Plain HTTP URLs get the same connection pool and retry policy
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=retries)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
         return session
 
-    def rate_limited_request(self, url, headers):
+    def _get_host_slot(self, url):
+        """
+        Return the semaphore bounding in-flight requests to the host of `url`.
         """
-        Perform a GET request respecting a random delay and retry policy.
+        host = urlsplit(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_concurrency)
+                self._host_slots[host] = slot
+        return slot
+
+    def rate_limited_request(self, url, headers=None):
+        """
+        Perform a GET request respecting the rate limiter and retry policy.
+
+        Safe to call from multiple threads: at most `max_concurrency`
+        requests to the same host are in flight at any given time. When
+        the server throttles the request (429/503) it is retried after the
+        `Retry-After` delay, or an exponential backoff when the header is
+        missing, up to `MAX_THROTTLE_RETRIES` times. Fresh cached responses
+        are returned straight away without waiting for the rate limiter.
 
         Args:
             url: Absolute URL to fetch.
-            headers: Dictionary of HTTP headers to send with the request.
+            headers: Optional HTTP headers to send in addition to the
+                session's `DEFAULT_HEADERS`.
 
         Returns:
             A `requests.Response` object on success, or `None` if the
             request ultimately fails even after retries.
         """
-        delay = random.uniform(3, 7)
-        time.sleep(delay)
-        try:
-            logger.info(f"Sending request to: {url} after {delay:.2f} seconds delay")
-            response = self.session.get(url, headers=headers)
-            response.raise_for_status()
-            logger.info(f"Received response from: {url}")
-            return response
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch {url}: {e}")
-            return None
+
+        # A fresh cache hit never reaches the server, so it does not need a token
+        if isinstance(self.session, CachedSession):
+            response = self.session.get(url, headers=headers, only_if_cached=True)
+            if response.status_code != 504:
+                logger.debug("Loaded %s from cache", url)
+                return response
+
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            delay = self.rate_limiter.acquire()
+            with self._get_host_slot(url):
+                try:
+                    logger.debug("Sending request to: %s after %.2f seconds delay", url, delay)
+                    response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+                    if response.status_code in THROTTLE_STATUS_CODES:
+                        pause = _parse_retry_after(response.headers.get('Retry-After'))
+                        if pause is None:
+                            pause = 2 ** attempt
+                        self.rate_limiter.throttle(pause)
+                        logger.warning("Throttled with status %s by %s, retrying in %.2f seconds at %.2f requests/s", response.status_code, url, pause, self.rate_limiter.rate)
+                        continue
+                    response.raise_for_status()
+                    self.rate_limiter.reward()
+                    logger.debug("Received response from: %s", url)
+                    return response
+                except requests.RequestException as e:
+                    logger.error("Failed to fetch %s: %s", url, e)
+                    return None
+
+        logger.error("Giving up on %s after %s throttled retries", url, MAX_THROTTLE_RETRIES)
+        return None
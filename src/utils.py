@@ -1,7 +1,15 @@
+from functools import lru_cache
+
+# Currency symbols and thousands separators dropped from prices and expenses
+_PRICE_DELETE_TABLE = str.maketrans('', '', '$.')
+
+
+@lru_cache(maxsize=4096)
 def clean_price_string(price_str):
-    return price_str.replace('$', '').replace('USD', '').replace('.', '').strip()
+    return price_str.translate(_PRICE_DELETE_TABLE).replace('USD', '').strip()
 
 
+@lru_cache(maxsize=4096)
 def get_currency_type(price_str):
     return 'USD' if 'USD' in price_str else 'ARS'
 
@@ -10,8 +18,9 @@ def clean_area_string(area_str):
     return area_str.replace('m²', '').strip()
 
 
+@lru_cache(maxsize=4096)
 def clean_expenses_string(expenses_str):
-    return expenses_str.replace('$', '').replace('.', '').replace('Expensas', '').strip()
+    return expenses_str.translate(_PRICE_DELETE_TABLE).replace('Expensas', '').strip()
 
 
 def safe_extract(element, selector, attribute=None):
@@ -19,13 +28,18 @@ def safe_extract(element, selector, attribute=None):
     Safely extract text or attribute value from an element.
 
     Args:
-        element: BeautifulSoup element to search within.
-        selector: CSS selector to find the target element.
+        element: lxml element to search within.
+        selector: Compiled `lxml.cssselect.CSSSelector` (or any lxml XPath
+            object) that finds the target element.
         attribute: Optional attribute name to extract (e.g., 'href').
     """
-    found = element.select_one(selector)
+    found = selector(element)
     if not found:
         return None
     if attribute:
-        return found.get(attribute)
-    return found.get_text(strip=True)
+        return found[0].get(attribute)
+
+    # Most card fields are a single text node, which needs no traversal
+    if len(found[0]) == 0:
+        return (found[0].text or '').strip()
+    return ''.join(text.strip() for text in found[0].itertext())
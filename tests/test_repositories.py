@@ -0,0 +1,112 @@
+import unittest
+from types import SimpleNamespace
+
+from src.repositories import ZonapropRepository
+
+
+class _StaticService:
+    """
+    Stand-in for `ScraperService` that returns the same body for every URL.
+    """
+
+    def __init__(self, content):
+        self.content = content
+
+    def rate_limited_request(self, url, headers=None):
+        return SimpleNamespace(content=self.content)
+
+
+class _PagedService:
+    """
+    Stand-in for `ScraperService` serving results pages by URL and counting requests.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def rate_limited_request(self, url, headers=None):
+        self.requested.append(url)
+        return SimpleNamespace(content=self.pages[url])
+
+
+def _results_page(pager):
+    """
+    Build a results page whose pager links each page number to its href.
+    """
+    anchors = ''.join(f'<a data-qa="PAGING_{num}" href="{href}">{num}</a>' for num, href in pager.items())
+    return f'<html><body><div>{anchors}</div></body></html>'.encode()
+
+
+class GetAllPageUrlsTest(unittest.TestCase):
+
+    BASE = 'https://www.zonaprop.com.ar'
+    START_URL = BASE + '/alquiler.html'
+
+    @staticmethod
+    def _href(num):
+        return '/alquiler.html' if num == 1 else f'/alquiler-pagina-{num}.html'
+
+    def _pager(self, *nums):
+        return {num: self._href(num) for num in nums}
+
+    def test_full_pager_needs_a_single_request(self):
+        service = _PagedService({self.START_URL: _results_page(self._pager(1, 2, 3))})
+        urls = ZonapropRepository(service).get_all_page_urls(self.START_URL)
+
+        self.assertEqual(urls, [self.BASE + self._href(num) for num in (1, 2, 3)])
+        self.assertEqual(service.requested, [self.START_URL])
+
+    def test_windowed_pager_is_followed(self):
+        service = _PagedService({
+            self.START_URL: _results_page(self._pager(1, 2, 3, 7)),
+            self.BASE + self._href(3): _results_page(self._pager(1, 2, 3, 4, 5, 7)),
+            self.BASE + self._href(5): _results_page(self._pager(3, 4, 5, 6, 7)),
+        })
+        repository = ZonapropRepository(service)
+
+        urls = repository.get_all_page_urls(self.START_URL)
+        self.assertEqual(urls, [self.BASE + self._href(num) for num in range(1, 8)])
+        self.assertEqual(service.requested, [self.START_URL, self.BASE + self._href(3), self.BASE + self._href(5)])
+
+        service.requested.clear()
+        urls = repository.get_all_page_urls(self.START_URL, max_pages=4)
+        self.assertEqual(urls, [self.BASE + self._href(num) for num in range(1, 5)])
+        self.assertEqual(service.requested, [self.START_URL, self.BASE + self._href(3)])
+
+    def test_pager_that_does_not_advance_stops(self):
+        # Without -pagina-N URLs or an active anchor, every page looks like page 1
+        pager = {1: '/p1.html', 2: '/p2.html', 3: '/p3.html', 9: '/p9.html'}
+        service = _PagedService({
+            self.START_URL: _results_page(pager),
+            self.BASE + '/p3.html': _results_page(pager),
+        })
+        urls = ZonapropRepository(service).get_all_page_urls(self.START_URL)
+
+        self.assertEqual(urls, [self.START_URL, self.BASE + '/p2.html', self.BASE + '/p3.html'])
+        self.assertEqual(service.requested, [self.START_URL, self.BASE + '/p3.html'])
+
+    def test_pager_linking_back_stops(self):
+        service = _PagedService({self.START_URL: _results_page({1: '/p1.html', 2: '/alquiler.html', 3: '/p3.html'})})
+        urls = ZonapropRepository(service).get_all_page_urls(self.START_URL)
+
+        self.assertEqual(urls, [self.START_URL])
+        self.assertEqual(service.requested, [self.START_URL])
+
+
+class EmptyResultsPageTest(unittest.TestCase):
+
+    URL = 'https://www.zonaprop.com.ar/casas-departamentos-ph-alquiler-caballito.html'
+
+    def test_scrape_page_returns_no_listings(self):
+        for content in (b'', b'   ', b'<!-- nothing -->'):
+            repository = ZonapropRepository(_StaticService(content))
+            self.assertEqual(repository.scrape_page(self.URL), [])
+
+    def test_get_all_page_urls_stops(self):
+        repository = ZonapropRepository(_StaticService(b''))
+        self.assertEqual(repository.get_all_page_urls(self.URL), [self.URL])
+
+
+if __name__ == '__main__':
+    unittest.main()
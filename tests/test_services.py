@@ -0,0 +1,89 @@
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from src.services import MAX_THROTTLE_RETRIES, ScraperService, TokenBucketRateLimiter, _parse_retry_after
+
+
+class _ThrottlingHandler(BaseHTTPRequestHandler):
+    """
+    Answer every request with 429 and `Retry-After: 0`, counting the hits.
+    """
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        self.send_response(429)
+        self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+
+    def test_delta_seconds(self):
+        self.assertEqual(_parse_retry_after('5'), 5.0)
+        self.assertEqual(_parse_retry_after(' 0 '), 0.0)
+
+    def test_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        self.assertAlmostEqual(_parse_retry_after(format_datetime(retry_at, usegmt=True)), 30, delta=2)
+
+    def test_past_http_date(self):
+        self.assertEqual(_parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(_parse_retry_after(None))
+        self.assertIsNone(_parse_retry_after(''))
+        self.assertIsNone(_parse_retry_after('soon'))
+        self.assertIsNone(_parse_retry_after('²'))
+
+
+class TokenBucketRateLimiterTest(unittest.TestCase):
+
+    def test_rejects_non_positive_rate(self):
+        for rate in (0, -1.0):
+            with self.assertRaises(ValueError):
+                TokenBucketRateLimiter(max_rate=rate)
+
+
+class ThrottledRequestTest(unittest.TestCase):
+
+    def setUp(self):
+        _ThrottlingHandler.hits = 0
+        self.server = HTTPServer(('127.0.0.1', 0), _ThrottlingHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def test_retry_after_is_handled_by_rate_limiter(self):
+        service = ScraperService(cache_name=None, requests_per_second=1000)
+        pauses = []
+        throttle = service.rate_limiter.throttle
+
+        def record_throttle(pause):
+            pauses.append(pause)
+            throttle(pause)
+
+        service.rate_limiter.throttle = record_throttle
+
+        self.assertIsNone(service.rate_limited_request(self.url))
+
+        # Every 429 reaches the limiter; urllib3 does not retry it on its own
+        self.assertEqual(_ThrottlingHandler.hits, MAX_THROTTLE_RETRIES + 1)
+        self.assertEqual(pauses, [0.0] * (MAX_THROTTLE_RETRIES + 1))
+        self.assertLess(service.rate_limiter.rate, 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()